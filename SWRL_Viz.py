@@ -1,195 +1,236 @@
+import functools
+import io
+import os
 import re
-from typing import Dict, List, Tuple, Set
+import sys
+from collections import defaultdict, namedtuple
+from typing import Dict, List, Optional, Tuple, Set, TextIO, Union
+
+# Separator between atoms: ^ with optional surrounding whitespace
+_ATOM_SEP = re.compile(r'\s*\^\s*')
+
+# DOT line templates (newline-terminated, written straight to the output)
+_CLS_TMPL = '    "%s" [shape=ellipse, fillcolor=lightgreen, style=filled];\n'
+_VAR_TMPL = '    "%s" [label="%s", fillcolor=lightblue, style="rounded,filled"];\n'
+_LIT_TMPL = '    "%s" [shape=box, style=filled, fillcolor=lightyellow];\n'
+_ANTE_TYPE_EDGE = '    "%s" -> "%s" [label="rdf:type", style=dashed];\n'
+_CONSEQ_TYPE_EDGE = '    "%s" -> "%s" [label="rdf:type", color=blue, penwidth=2, style=dashed];\n'
+_ANTE_EDGE = '    "%s" -> "%s" [label="%s"];\n'
+_CONSEQ_EDGE = '    "%s" -> "%s" [label="%s", color=blue, penwidth=2];\n'
+
+# Parsed atoms; qname is the prefixed name, e.g. bot:Building
+ClassAtom = namedtuple('ClassAtom', 'prefix cls var qname')
+PropAtom = namedtuple('PropAtom', 'prefix prop subj obj qname')
+
+def _is_word(s: str) -> bool:
+    """True if s is a non-empty run of letters, digits or underscores"""
+    return s.replace('_', 'a').isalnum()
+
+def _is_variable(s: str) -> bool:
+    """True if s looks like a SWRL variable, e.g. ?b"""
+    return s[:1] == '?' and _is_word(s[1:])
+
+def _split_rule(rule: str) -> Tuple[List[str], List[str]]:
+    """Split a SWRL rule into antecedent and consequent atom strings"""
+    # Split by arrow
+    parts = rule.split('->')
+    if len(parts) != 2:
+        raise ValueError("Invalid SWRL rule: missing '->' separator")
+    
+    antecedent = parts[0].strip()
+    consequent = parts[1].strip()
+    
+    # Parse atoms (separated by ^)
+    antecedent_atoms = [atom.strip() for atom in _ATOM_SEP.split(antecedent)]
+    consequent_atoms = [atom.strip() for atom in _ATOM_SEP.split(consequent)]
+    
+    return antecedent_atoms, consequent_atoms
+
+def _tokenize_atom(atom: str) -> Tuple[str, str, str, Optional[str]]:
+    """Split an atom into (prefix, name, subject, object); object is None for class atoms"""
+    # Class atoms: prefix:ClassName(?var)
+    # Property atoms: prefix:propertyName(?var1, ?var2) or (?var1, literal)
+    colon_idx = atom.find(':')
+    paren_idx = atom.find('(', colon_idx + 1)
+    close_idx = atom.rfind(')')
+    if colon_idx == -1 or paren_idx == -1 or close_idx < paren_idx:
+        raise ValueError(f"Cannot parse atom: {atom}")
+    
+    prefix = atom[:colon_idx]
+    name = atom[colon_idx + 1:paren_idx]
+    if not (_is_word(prefix) and _is_word(name)):
+        raise ValueError(f"Cannot parse atom: {atom}")
+    
+    # Only property atoms have a comma between the parentheses
+    comma_idx = atom.find(',', paren_idx + 1, close_idx)
+    if comma_idx == -1:
+        variable = atom[paren_idx + 1:close_idx]
+        if not _is_variable(variable):
+            raise ValueError(f"Cannot parse atom: {atom}")
+        return prefix, name, variable, None
+    
+    subject = atom[paren_idx + 1:comma_idx]
+    obj = atom[comma_idx + 1:close_idx].strip()
+    if not (_is_variable(subject) and obj):
+        raise ValueError(f"Cannot parse atom: {atom}")
+    return prefix, name, subject, obj
+
+# Use the compiled tokenizer when it has been built (cythonize -i _swrl_parse.pyx)
+try:
+    from _swrl_parse import split_rule as _split_rule, tokenize_atom as _tokenize_atom
+except ImportError:
+    pass
 
 class SWRLToDOT:
     """Convert SWRL rules to DOT graph format"""
     
     def __init__(self):
-        self.variables = set()
-        self.classes = {}  # variable -> class
-        self.properties = []  # (subject, predicate, object)
+        self._reset()
         self.atoms = []
+    
+    def _reset(self):
+        """Clear per-rule state before converting a new rule"""
+        self.variables = set()
+        # part -> variable -> classes
+        self.classes = {'antecedent': defaultdict(list), 'consequent': defaultdict(list)}
+        self._all_classes = set()  # unique prefixed class names
+        # part -> (subject, object, predicate)
+        self.properties = {'antecedent': [], 'consequent': []}
+        self.literals = set()  # non-variable property objects
         
     def parse_swrl_rule(self, rule: str) -> Tuple[List[str], List[str]]:
         """Parse SWRL rule into antecedent and consequent atoms"""
-        # Split by arrow
-        parts = rule.split('->')
-        if len(parts) != 2:
-            raise ValueError("Invalid SWRL rule: missing '->' separator")
-        
-        antecedent = parts[0].strip()
-        consequent = parts[1].strip()
+        return _split_rule(rule)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def parse_atom(atom: str) -> Union[ClassAtom, PropAtom]:
+        """Parse a single SWRL atom (cached; the returned record is shared)"""
+        prefix, name, subject, obj = _tokenize_atom(atom)
         
-        # Parse atoms (separated by ^)
-        antecedent_atoms = [atom.strip() for atom in re.split(r'\s*\^\s*', antecedent)]
-        consequent_atoms = [atom.strip() for atom in re.split(r'\s*\^\s*', consequent)]
+        # Interned, since the same names recur across many atoms and rules
+        prefix = sys.intern(prefix)
+        name = sys.intern(name)
+        subject = sys.intern(subject)
+        qname = sys.intern(f"{prefix}:{name}")
+        if obj is None:
+            return ClassAtom(prefix, name, subject, qname)
         
-        return antecedent_atoms, consequent_atoms
-    
-    def parse_atom(self, atom: str) -> Dict:
-        """Parse a single SWRL atom"""
-        # Pattern for class atoms: prefix:ClassName(?var)
-        class_pattern = r'(\w+):(\w+)\((\?\w+)\)'
-        # Pattern for property atoms: prefix:propertyName(?var1, ?var2) or (?var1, literal)
-        property_pattern = r'(\w+):(\w+)\((\?\w+),\s*(.+?)\)'
+        if obj[:1] == '?':
+            obj = sys.intern(obj)
+        return PropAtom(prefix, name, subject, obj, qname)
+    
+    def generate_dot(self, rule: str, output_file: str = None) -> str:
+        """Generate DOT graph from SWRL rule"""
+        self._load_rule(rule)
         
-        class_match = re.match(class_pattern, atom)
-        if class_match:
-            prefix, class_name, variable = class_match.groups()
-            return {
-                'type': 'class',
-                'prefix': prefix,
-                'class': class_name,
-                'variable': variable
-            }
+        # Generate DOT
+        buf = io.StringIO()
+        self._create_dot_graph(buf)
+        dot = buf.getvalue()
         
-        property_match = re.match(property_pattern, atom)
-        if property_match:
-            prefix, property_name, subject, obj = property_match.groups()
-            obj = obj.strip()
-            return {
-                'type': 'property',
-                'prefix': prefix,
-                'property': property_name,
-                'subject': subject,
-                'object': obj
-            }
+        # Save to file if specified
+        if output_file:
+            with open(output_file, 'w') as f:
+                f.write(dot)
+            print(f"DOT file saved to: {output_file}")
         
-        raise ValueError(f"Cannot parse atom: {atom}")
+        return dot
     
-    def generate_dot(self, rule: str, output_file: str = None) -> str:
-        """Generate DOT graph from SWRL rule"""
+    def write_dot(self, rule: str, out: TextIO) -> None:
+        """Stream the DOT graph for a SWRL rule to an open text file"""
+        self._load_rule(rule)
+        self._create_dot_graph(out)
+    
+    def _load_rule(self, rule: str) -> None:
+        """Parse a SWRL rule and collect its variables, classes and properties"""
         # Reset state
-        self.variables = set()
-        self.classes = {}
-        self.properties = []
+        self._reset()
         
         # Parse rule
         antecedent_atoms, consequent_atoms = self.parse_swrl_rule(rule)
         
-        # Process all atoms
-        all_atoms = []
+        # Parse atoms and extract variables, classes, and properties
         for atom in antecedent_atoms:
             parsed = self.parse_atom(atom)
-            parsed['part'] = 'antecedent'
-            all_atoms.append(parsed)
+            _HANDLERS[type(parsed)](self, parsed, 'antecedent')
             
         for atom in consequent_atoms:
             parsed = self.parse_atom(atom)
-            parsed['part'] = 'consequent'
-            all_atoms.append(parsed)
-        
-        # Extract variables, classes, and properties
-        for atom in all_atoms:
-            if atom['type'] == 'class':
-                var = atom['variable']
-                self.variables.add(var)
-                if var not in self.classes:
-                    self.classes[var] = []
-                self.classes[var].append({
-                    'class': f"{atom['prefix']}:{atom['class']}",
-                    'part': atom['part']
-                })
-            elif atom['type'] == 'property':
-                subject = atom['subject']
-                obj = atom['object']
-                self.variables.add(subject)
-                if obj.startswith('?'):
-                    self.variables.add(obj)
-                self.properties.append({
-                    'subject': subject,
-                    'predicate': f"{atom['prefix']}:{atom['property']}",
-                    'object': obj,
-                    'part': atom['part']
-                })
-        
-        # Generate DOT
-        dot = self._create_dot_graph()
-        
-        # Save to file if specified
-        if output_file:
-            with open(output_file, 'w') as f:
-                f.write(dot)
-            print(f"DOT file saved to: {output_file}")
-        
-        return dot
+            _HANDLERS[type(parsed)](self, parsed, 'consequent')
     
-    def _create_dot_graph(self) -> str:
-        """Create DOT graph representation"""
-        lines = []
-        lines.append('digraph SWRL_Rule {')
-        # lines.append('    rankdir=TD;')
-        lines.append('    rankdir=LR;')
-        lines.append('    node [shape=box, style=rounded];')
-        lines.append('')
+    def _handle_class(self, atom: ClassAtom, part: str) -> None:
+        """Record a class atom from the given rule part"""
+        var = atom.var
+        self.variables.add(var)
+        cls = atom.qname
+        self.classes[part][var].append(cls)
+        self._all_classes.add(cls)
+    
+    def _handle_prop(self, atom: PropAtom, part: str) -> None:
+        """Record a property atom from the given rule part"""
+        subject = atom.subj
+        obj = atom.obj
+        self.variables.add(subject)
+        if obj[:1] == '?':
+            self.variables.add(obj)
+        else:
+            self.literals.add(obj)
+        self.properties[part].append((subject, obj, atom.qname))
+    
+    def _create_dot_graph(self, out: TextIO) -> None:
+        """Write DOT graph representation to out"""
+        write = out.write
+        sorted_vars = tuple(sorted(self.variables))
+        sorted_classes = tuple(sorted(self._all_classes))
+        sorted_literals = tuple(sorted(self.literals))
         
-        # Collect all unique classes
-        all_classes = set()
-        for var, class_list in self.classes.items():
-            for cls_info in class_list:
-                all_classes.add(cls_info['class'])
+        write('digraph SWRL_Rule {\n')
+        # write('    rankdir=TD;\n')
+        write('    rankdir=LR;\n')
+        write('    node [shape=box, style=rounded];\n')
+        write('\n')
         
         # Add class nodes
-        lines.append('    // Classes')
-        for cls in sorted(all_classes):
-            lines.append(f'    "{cls}" [shape=ellipse, fillcolor=lightgreen, style=filled];')
+        write('    // Classes\n')
+        out.writelines(_CLS_TMPL % cls for cls in sorted_classes)
         
-        lines.append('')
+        write('\n')
         
         # Add variables as nodes (without class labels)
-        lines.append('    // Variables (Instances)')
-        for var in sorted(self.variables):
-            lines.append(f'    "{var}" [label="{var}", fillcolor=lightblue, style="rounded,filled"];')
+        write('    // Variables (Instances)\n')
+        out.writelines(_VAR_TMPL % (var, var) for var in sorted_vars)
         
-        lines.append('')
+        write('\n')
         
         # Add literal nodes for non-variable objects
-        lines.append('    // Literals')
-        literals = set()
-        for prop in self.properties:
-            obj = prop['object']
-            if not obj.startswith('?'):
-                literals.add(obj)
+        write('    // Literals\n')
+        out.writelines(_LIT_TMPL % literal for literal in sorted_literals)
         
-        for literal in sorted(literals):
-            lines.append(f'    "{literal}" [shape=box, style=filled, fillcolor=lightyellow];')
-        
-        lines.append('')
+        write('\n')
         
         # Add class-to-instance edges (type relationships)
-        lines.append('    // Class Assertions (rdf:type)')
-        for var in sorted(self.variables):
-            if var in self.classes:
-                for cls_info in self.classes[var]:
-                    cls = cls_info['class']
-                    part = cls_info['part']
-                    # Style edges differently for consequent
-                    if part == 'consequent':
-                        lines.append(f'    "{cls}" -> "{var}" [label="rdf:type", color=blue, penwidth=2, style=dashed];')
-                    else:
-                        lines.append(f'    "{cls}" -> "{var}" [label="rdf:type", style=dashed];')
+        write('    // Class Assertions (rdf:type)\n')
+        # Consequent edges are styled differently
+        ante_classes = self.classes['antecedent']
+        conseq_classes = self.classes['consequent']
+        for var in sorted_vars:
+            out.writelines(_ANTE_TYPE_EDGE % (cls, var) for cls in ante_classes.get(var, ()))
+            out.writelines(_CONSEQ_TYPE_EDGE % (cls, var) for cls in conseq_classes.get(var, ()))
         
-        lines.append('')
+        write('\n')
         
         # Add properties as edges
-        lines.append('    // Properties')
-        for prop in self.properties:
-            subject = prop['subject']
-            predicate = prop['predicate']
-            obj = prop['object']
-            part = prop['part']
-            
-            # Style edges differently for consequent
-            if part == 'consequent':
-                lines.append(f'    "{subject}" -> "{obj}" [label="{predicate}", color=blue, penwidth=2];')
-            else:
-                lines.append(f'    "{subject}" -> "{obj}" [label="{predicate}"];')
+        write('    // Properties\n')
+        out.writelines(_ANTE_EDGE % prop for prop in self.properties['antecedent'])
+        out.writelines(_CONSEQ_EDGE % prop for prop in self.properties['consequent'])
         
-        lines.append('}')
-        
-        return '\n'.join(lines)
+        write('}')
     
 
+# Atom record type -> SWRLToDOT handler
+_HANDLERS = {ClassAtom: SWRLToDOT._handle_class, PropAtom: SWRLToDOT._handle_prop}
+
 swrl_rule = """bot:Building(?b) ^ bot:hasElement(?b, ?ew) ^ fisa:ExternalWall(?ew) ^ fisa:hasDistanceToBoundary(?ew, 0.0) -> fisa:FireWallAsExternalWall(?ew) ^ fisa:hasRequirementOfFireResistance(?ew, fisa:feuerbeständig) ^ fisa:hasRequirementOfFireBehaviour(?ew, fisa:nichtbrennbar) ^ fisa:hasAssessmentBasis(?ew, fisa:MBO_P30_A2_N1_A)"""
 
 # Create converter
@@ -248,6 +289,50 @@ def swrl_to_dot(swrl_rule: str, output_file: str = 'output.dot') -> str:
     converter = SWRLToDOT()
     return converter.generate_dot(swrl_rule, output_file)
 
+def swrl_to_dot_many(swrl_rules, out_dir: str = '.', render_pdf: bool = False) -> List[str]:
+    """
+    Convert several SWRL rules to DOT files, reusing a single converter.
+    
+    Parameters:
+    -----------
+    swrl_rules : iterable of str
+        The SWRL rule strings
+    out_dir : str
+        Directory for the output files, created if missing (default: '.')
+    render_pdf : bool
+        Also render each graph to PDF with graphviz (default: False)
+    
+    Returns:
+    --------
+    list of str : The DOT graph content for each rule
+    
+    Files are named swrl_rule_1.dot, swrl_rule_2.dot, ... in rule order.
+    
+    Example:
+    --------
+    rules = ["bot:Building(?b) -> bot:Zone(?b)", "bot:Space(?s) -> bot:Zone(?s)"]
+    dots = swrl_to_dot_many(rules, 'graphs', render_pdf=True)
+    """
+    graphviz = None
+    if render_pdf:
+        try:
+            import graphviz
+        except ImportError:
+            print("Graphviz not installed. Install with: pip install graphviz")
+    
+    os.makedirs(out_dir, exist_ok=True)
+    converter = SWRLToDOT()
+    dots = []
+    for i, rule in enumerate(swrl_rules, start=1):
+        base = os.path.join(out_dir, f'swrl_rule_{i}')
+        dot_content = converter.generate_dot(rule, output_file=base + '.dot')
+        if graphviz is not None:
+            graphviz.Source(dot_content).render(base, format='pdf', cleanup=True)
+            print(f"Graph rendered to {base}.pdf")
+        dots.append(dot_content)
+    
+    return dots
+
 # Test with your custom rule
 print("Ready to convert SWRL rules to DOT format!")
 print("Use: swrl_to_dot(your_rule, 'output.dot')")
@@ -0,0 +1,83 @@
+# cython: language_level=3
+"""Compiled tokenizer for SWRL_Viz.py
+
+Build in place with: cythonize -i _swrl_parse.pyx
+SWRL_Viz.py falls back to its pure-Python tokenizer when this module is missing.
+"""
+
+cdef inline bint _is_word(str s, Py_ssize_t start, Py_ssize_t end):
+    """True if s[start:end] is a non-empty run of letters, digits or underscores"""
+    cdef Py_ssize_t i
+    cdef Py_UCS4 ch
+    if end <= start:
+        return False
+    for i in range(start, end):
+        ch = s[i]
+        if not (ch == u'_' or ch.isalnum()):
+            return False
+    return True
+
+cdef inline bint _is_variable(str s, Py_ssize_t start, Py_ssize_t end):
+    """True if s[start:end] looks like a SWRL variable, e.g. ?b"""
+    return start < end and s[start] == u'?' and _is_word(s, start + 1, end)
+
+cpdef tuple split_rule(str rule):
+    """Split a SWRL rule into antecedent and consequent atom strings"""
+    # Split by arrow
+    parts = rule.split('->')
+    if len(parts) != 2:
+        raise ValueError("Invalid SWRL rule: missing '->' separator")
+
+    # Parse atoms (separated by ^); stripping each atom also drops the
+    # whitespace around the separators
+    antecedent_atoms = [atom.strip() for atom in (<str>parts[0]).split('^')]
+    consequent_atoms = [atom.strip() for atom in (<str>parts[1]).split('^')]
+
+    return antecedent_atoms, consequent_atoms
+
+cpdef tuple tokenize_atom(str atom):
+    """Split an atom into (prefix, name, subject, object); object is None for class atoms"""
+    cdef Py_ssize_t n = len(atom)
+    cdef Py_ssize_t i
+    cdef Py_ssize_t colon_idx = -1
+    cdef Py_ssize_t paren_idx = -1
+    cdef Py_ssize_t close_idx = -1
+    cdef Py_ssize_t comma_idx = -1
+
+    # Class atoms: prefix:ClassName(?var)
+    # Property atoms: prefix:propertyName(?var1, ?var2) or (?var1, literal)
+    for i in range(n):
+        if atom[i] == u':':
+            colon_idx = i
+            break
+    if colon_idx != -1:
+        for i in range(colon_idx + 1, n):
+            if atom[i] == u'(':
+                paren_idx = i
+                break
+    for i in range(n - 1, -1, -1):
+        if atom[i] == u')':
+            close_idx = i
+            break
+    if colon_idx == -1 or paren_idx == -1 or close_idx < paren_idx:
+        raise ValueError(f"Cannot parse atom: {atom}")
+
+    if not (_is_word(atom, 0, colon_idx) and _is_word(atom, colon_idx + 1, paren_idx)):
+        raise ValueError(f"Cannot parse atom: {atom}")
+
+    for i in range(paren_idx + 1, close_idx):
+        if atom[i] == u',':
+            comma_idx = i
+            break
+
+    prefix = atom[:colon_idx]
+    name = atom[colon_idx + 1:paren_idx]
+    if comma_idx == -1:
+        if not _is_variable(atom, paren_idx + 1, close_idx):
+            raise ValueError(f"Cannot parse atom: {atom}")
+        return prefix, name, atom[paren_idx + 1:close_idx], None
+
+    obj = atom[comma_idx + 1:close_idx].strip()
+    if not (_is_variable(atom, paren_idx + 1, comma_idx) and obj):
+        raise ValueError(f"Cannot parse atom: {atom}")
+    return prefix, name, atom[paren_idx + 1:comma_idx], obj